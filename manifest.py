@@ -0,0 +1,5 @@
+# Freeze manifest for building wifi.py into the firmware as bytecode.
+# Include from your port's build with:
+#   make FROZEN_MANIFEST=/path/to/this/manifest.py
+include("$(PORT_DIR)/boards/manifest.py")
+freeze(".", "wifi.py")
@@ -5,30 +5,184 @@
 # Description: Networking connectivity manager for MicroPython.
 
 import gc
+import os
 import sys
 import network
-import machine
 import socket
 import uasyncio as asyncio
-import ure
+import uselect
 import utime
 
+from micropython import const
+
 DEFAULT_SSID = "ESP32"
 DEFAULT_SSID_PASSWORD = "password"
 
+# Set True for serial logging; each print blocks on the UART for ~1ms
+DEBUG = False
+
 SERVER_IP = '10.0.0.1'
 SERVER_SUBNET = '255.255.255.0'
 WIFI_CREDENTIALS_FILE = 'wifi.dat'
 
+# const() values are inlined into the bytecode, avoiding a global dict
+# lookup on every access in the hot DNS/connect paths
+_DNS_HDR_LEN = const(12)
+_DNS_OPCODE_MASK = const(15)
+_CONNECT_TIMEOUT_MS = const(10000)
+_SCAN_CACHE_TTL_MS = const(15000)
+
+# Static tail of every DNS answer: pointer to the queried name, response
+# type, class, TTL, data length and the (fixed) server IP. Built once at
+# import since SERVER_IP never changes.
+_DNS_ANSWER_TAIL = (b'\xC0\x0C\x00\x01\x00\x01\x00\x00\x00\x3C\x00\x04'
+                    + bytes(int(x) for x in SERVER_IP.split('.')))
+
+# Static halves of the WiFi selection page, built once at import time so no
+# per-request string formatting is needed. Only the <option> list between
+# them is generated per request.
+_PAGE_HEAD = b"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>WiFi Setup</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 0;
+            background-color: #f0f0f0;
+            color: #333;
+            text-align: center;
+        }
+        h1 {
+            font-size: 24px;
+            margin: 20px 0;
+        }
+        form {
+            background-color: #fff;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+            margin: 20px auto;
+            max-width: 400px;
+            width: 100%;
+        }
+        label {
+            display: block;
+            margin-bottom: 10px;
+            font-size: 16px;
+        }
+        select, input[type="password"], input[type="submit"] {
+            width: calc(100% - 22px);
+            padding: 10px;
+            margin: 10px 0;
+            border: 1px solid #ccc;
+            border-radius: 4px;
+            font-size: 16px;
+        }
+        input[type="submit"] {
+            background-color: #4CAF50;
+            color: white;
+            border: none;
+            cursor: pointer;
+        }
+        input[type="submit"]:hover {
+            background-color: #45a049;
+        }
+        input[type="submit"]:disabled {
+            background-color: #ccc;
+            cursor: not-allowed;
+        }
+        @media (max-width: 600px) {
+            h1 {
+                font-size: 20px;
+            }
+            form {
+                padding: 15px;
+                max-width: 90%;
+            }
+        }
+    </style>
+    <script>
+        function handleFormSubmit() {
+            var submitButton = document.getElementById('submit-button');
+            submitButton.disabled = true;
+            submitButton.value = 'Connecting...';
+        }
+
+        function resetButton() {
+            var submitButton = document.getElementById('submit-button');
+            submitButton.disabled = false;
+            submitButton.value = 'Connect';
+        }
+
+        // Call resetButton when the page loads
+        window.onload = resetButton;
+
+        // Add event listener for popstate to reset the button when navigating back
+        window.addEventListener('popstate', function(event) {
+            resetButton();
+        });
+
+        window.addEventListener('pageshow', function(event) {
+            resetButton();
+        });
+    </script>
+</head>
+<body>
+    <h1>Configure WiFi</h1>
+    <form action="/configure" method="post" onsubmit="handleFormSubmit()">
+        <label for="ssid">Select SSID:</label>
+        <select id="ssid" name="ssid">
+"""
+
+_PAGE_TAIL = b"""        </select>
+        <label for="password">Password:</label>
+        <input type="password" id="password" name="password" required>
+        <input type="submit" id="submit-button" value="Connect">
+    </form>
+</body>
+</html>
+"""
+
+_SUCCESS_PAGE = b"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Connected</title>
+    <style>
+        body { font-family: Arial, sans-serif; text-align: center; padding: 50px; }
+        h1 { color: #4CAF50; }
+        p { font-size: 18px; }
+        .countdown { font-size: 24px; color: #FF5722; }
+    </style>
+</head>
+<body>
+    <h1>Connected!</h1>
+    <p>You are now connected to the WiFi network.  Closing window...</p>
+</body>
+</html>
+"""
+
 class WifiManager:
     def __init__(self, ssid=DEFAULT_SSID, password=DEFAULT_SSID_PASSWORD):
         self.ssid = ssid  # Store the provided SSID
         self.password = password  # Store the provided password
+        # Only touch radio state when it actually needs changing; each
+        # active() toggle reinitializes the radio (~100ms on ESP32)
         self.wlan_sta = network.WLAN(network.STA_IF)
-        self.wlan_sta.active(True)
-        self.wlan_sta.disconnect()  # Disconnect on startup
+        if not self.wlan_sta.active():
+            self.wlan_sta.active(True)
+        if self.wlan_sta.isconnected():
+            self.wlan_sta.disconnect()  # Disconnect on startup
         self.wlan_ap = network.WLAN(network.AP_IF)
-        self.wlan_ap.active(False)
+        if self.wlan_ap.active():
+            self.wlan_ap.active(False)
+        self._scan_cache = None  # Cached scan results for the captive portal
+        self._scan_ts = 0
 
     async def connect(self):
         """ Attempt to connect using saved credentials or provided defaults """
@@ -46,38 +200,53 @@ class WifiManager:
         return False
 
     async def _wifi_connect(self, ssid, password):
-        print(f'Trying to connect to: {ssid}')
+        if DEBUG:
+            print(f'Trying to connect to: {ssid}')
         self.wlan_sta.connect(ssid, password)
-        for _ in range(100):  # Timeout after 10 seconds
+        # Poll with exponential backoff (10ms up to 200ms) so the scheduler
+        # wakes ~15 times per attempt instead of 100
+        delay = 0.01
+        deadline = utime.ticks_add(utime.ticks_ms(), _CONNECT_TIMEOUT_MS)
+        while utime.ticks_diff(deadline, utime.ticks_ms()) > 0:
             if self.wlan_sta.isconnected():
-                print(f'\nConnected to {ssid}! Network info: {self.wlan_sta.ifconfig()}')
+                if DEBUG:
+                    print(f'Connected to {ssid}! Network info: {self.wlan_sta.ifconfig()}')
                 return True
-
-            print('.', end='')
-            await asyncio.sleep(0.1)  # Use asyncio.sleep instead of utime.sleep_ms
-        print(f'\nConnection to {ssid} failed!')
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 0.2)
+        if DEBUG:
+            print(f'Connection to {ssid} failed!')
         self.wlan_sta.disconnect()
         return False
 
     def _read_profiles(self):
-        """ Read stored WiFi profiles from the file """
+        """ Read stored WiFi profiles from the file as bytes """
         try:
-            with open(WIFI_CREDENTIALS_FILE) as f:
-                lines = f.readlines()
+            f = open(WIFI_CREDENTIALS_FILE, 'rb')
         except OSError:
             return {}
 
         profiles = {}
-        for line in lines:
-            ssid, password = line.strip().split(';')
-            profiles[ssid] = password
+        try:
+            # Iterate the file directly instead of materializing readlines(),
+            # and keep ssid/password as bytes to skip the UTF-8 decode
+            for line in f:
+                ssid, _, password = line.rstrip(b'\n').partition(b';')
+                if ssid:
+                    profiles[ssid] = password
+        finally:
+            f.close()
         return profiles
 
     def _write_profiles(self, profiles):
-        """ Write WiFi profiles to the file """
-        with open(WIFI_CREDENTIALS_FILE, 'w') as f:
-            for ssid, password in profiles.items():
-                f.write(f'{ssid};{password}\n')
+        """ Write WiFi profiles to the file atomically """
+        # Write everything to a temp file in one call, then rename over the
+        # old file, so a power loss mid-write can't corrupt saved credentials
+        lines = [b'%s;%s\n' % (ssid, password) for ssid, password in profiles.items()]
+        tmp_file = WIFI_CREDENTIALS_FILE + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(b''.join(lines))
+        os.rename(tmp_file, WIFI_CREDENTIALS_FILE)
 
     async def start_captive_portal(self):
         """ Start the access point and DNS/HTTP server for captive portal """
@@ -85,22 +254,26 @@ class WifiManager:
 
         # Start HTTP server
         self.server = await asyncio.start_server(self.handle_http_connection, "0.0.0.0", 80)
-        print('HTTP server started on 0.0.0.0:80')
+        if DEBUG:
+            print('HTTP server started on 0.0.0.0:80')
 
         # Start the DNS server task
         asyncio.create_task(self.run_dns_server())
 
         # Loop forever handling requests
-        print('Captive portal running...')
+        if DEBUG:
+            print('Captive portal running...')
         try:
             async with self.server:
                 await self.server.wait_closed()  # Wait until the server is closed
         except Exception as e:
-            print(f"Server error: {e}")
+            if DEBUG:
+                print(f"Server error: {e}")
 
         # When WiFi is connected, stop the access point
         self.wlan_ap.active(False)
-        print('WiFi connected, stopping captive portal.')
+        if DEBUG:
+            print('WiFi connected, stopping captive portal.')
 
     async def handle_http_connection(self, reader, writer):
         """ Handle the HTTP connection for captive portal """
@@ -109,223 +282,107 @@ class WifiManager:
         # Get the HTTP request line
         data = await reader.readline()
         request_line = data.decode()
-        addr = writer.get_extra_info('peername')
-        print(f'Received {request_line.strip()} from {addr}')
+        if DEBUG:
+            addr = writer.get_extra_info('peername')
+            print(f'Received {request_line.strip()} from {addr}')
 
-        # Read headers (to make client happy)
-        headers = {}
+        # Read headers (to make client happy). Content-Length is the only
+        # one we care about, so scan the raw bytes instead of building a dict
+        content_length = 0
         while True:
-            gc.collect()
             line = await reader.readline()
             if line == b'\r\n':
                 break
-            # Parse the headers
-            header = line.decode().strip()
-            if ':' in header:
-                key, value = header.split(': ', 1)
-                headers[key.lower()] = value
+            if line[:15].lower() == b'content-length:':
+                content_length = int(line[15:].strip())
 
         # Check if it's a POST request to save credentials
         if request_line.startswith("POST /configure"):
-            if 'content-length' not in headers:
-                print('No Content-Length header found')
-                await writer.awrite('HTTP/1.0 400 Bad Request\r\n\r\nMissing Content-Length')
+            if not content_length:
+                if DEBUG:
+                    print('No Content-Length header found')
+                writer.write(b'HTTP/1.0 400 Bad Request\r\n\r\nMissing Content-Length')
+                await writer.drain()
                 await writer.aclose()
                 return
 
-            content_length = int(headers['content-length'])
-
             try:
-                await reader.readexactly(2)  # Skip \r\n
-                post_data = await reader.read(content_length)
+                # The header loop above already consumed the blank line, so
+                # the body starts immediately -- parse all of it
+                post_data = await reader.readexactly(content_length)
 
-                # Parse POST data (SSID and password)
-                post_str = post_data.decode()
-                post_str = url_decode(post_str)
-                match = ure.search(r'id=([^&]*)&password=(.*)', post_str)
-                if match:
-                    ssid = match.group(1)
-                    password = match.group(2)
+                # Parse POST data (SSID and password) without regex, straight
+                # off the raw bytes
+                pairs = dict(p.split(b'=', 1) for p in post_data.split(b'&'))
+                if b'ssid' in pairs and b'password' in pairs:
+                    ssid = _urldecode(pairs[b'ssid'])
+                    password = _urldecode(pairs[b'password'])
 
                     # Try to connect with the new credentials
                     if await self._wifi_connect(ssid, password):  # Ensure we await the connection
-                        print(f'Successfully connected to {ssid}')
+                        if DEBUG:
+                            print(f'Successfully connected to {ssid}')
                         # Save the credentials
                         profiles = self._read_profiles()
                         profiles[ssid] = password
                         self._write_profiles(profiles)
 
-                        # Send redirect response to the success page
-                        response = 'HTTP/1.0 302 Found\r\nLocation: /success\r\n\r\n'
-                        await writer.awrite(response)
+                        # Reply with the success page directly and shut the
+                        # portal down -- no redirect round-trip, no timer
+                        writer.write(b'HTTP/1.0 200 OK\r\nConnection: close\r\n\r\n')
+                        writer.write(_SUCCESS_PAGE)
+                        await writer.drain()
+                        await writer.aclose()
+                        self.server.close()
+                        return
                     else:
-                        print(f'Failed to connect to {ssid}')
-                        await writer.awrite('HTTP/1.0 200 OK\r\n\r\nFailed to connect to the network. Please try again.')
+                        if DEBUG:
+                            print(f'Failed to connect to {ssid}')
+                        writer.write(b'HTTP/1.0 200 OK\r\n\r\nFailed to connect to the network. Please try again.')
                 else:
-                    await writer.awrite('HTTP/1.0 400 Bad Request\r\n\r\nInvalid data!')
+                    writer.write(b'HTTP/1.0 400 Bad Request\r\n\r\nInvalid data!')
             except Exception as e:
-                print(f'Error while processing POST data: {e}')
-                await writer.awrite('HTTP/1.0 500 Internal Server Error\r\n\r\nError processing request.')
-        elif request_line.startswith("GET /success"):
-            # Serve the success page
-            response = 'HTTP/1.0 200 OK\r\n\r\n' + self._generate_success_page()
-            await writer.awrite(response)
-            # TODO: Replace this with non Timer approach
-            timer = machine.Timer(0)
-            timer.init(period=int(500), mode=machine.Timer.ONE_SHOT, callback=lambda x: self.server.close())
+                if DEBUG:
+                    print(f'Error while processing POST data: {e}')
+                writer.write(b'HTTP/1.0 500 Internal Server Error\r\n\r\nError processing request.')
         else:
             # Serve WiFi network selection form
-            response = 'HTTP/1.0 200 OK\r\n\r\n' + self._generate_wifi_selection_page()
-            await writer.awrite(response)
+            writer.write(b'HTTP/1.0 200 OK\r\n\r\n')
+            self._write_wifi_selection_page(writer)
 
+        await writer.drain()
         await writer.aclose()
     
-    def _generate_wifi_selection_page(self):
-        """ Generate HTML form with a list of nearby WiFi networks """
-        wifi_networks = self.wlan_sta.scan()
-        wifi_options = ""
-        for ssid, *_ in wifi_networks:
-            ssid = ssid.decode("utf-8")
-            if ssid:  # Check if SSID is not empty
-                wifi_options += f'<option value="{ssid}">{ssid}</option>\n'
-
-        html = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>WiFi Setup</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 0;
-                    padding: 0;
-                    background-color: #f0f0f0;
-                    color: #333;
-                    text-align: center;
-                }}
-                h1 {{
-                    font-size: 24px;
-                    margin: 20px 0;
-                }}
-                form {{
-                    background-color: #fff;
-                    padding: 20px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-                    margin: 20px auto;
-                    max-width: 400px;
-                    width: 100%;
-                }}
-                label {{
-                    display: block;
-                    margin-bottom: 10px;
-                    font-size: 16px;
-                }}
-                select, input[type="password"], input[type="submit"] {{
-                    width: calc(100% - 22px);
-                    padding: 10px;
-                    margin: 10px 0;
-                    border: 1px solid #ccc;
-                    border-radius: 4px;
-                    font-size: 16px;
-                }}
-                input[type="submit"] {{
-                    background-color: #4CAF50;
-                    color: white;
-                    border: none;
-                    cursor: pointer;
-                }}
-                input[type="submit"]:hover {{
-                    background-color: #45a049;
-                }}
-                input[type="submit"]:disabled {{
-                    background-color: #ccc;
-                    cursor: not-allowed;
-                }}
-                @media (max-width: 600px) {{
-                    h1 {{
-                        font-size: 20px;
-                    }}
-                    form {{
-                        padding: 15px;
-                        max-width: 90%;
-                    }}
-                }}
-            </style>
-            <script>
-                function handleFormSubmit() {{
-                    var submitButton = document.getElementById('submit-button');
-                    submitButton.disabled = true;
-                    submitButton.value = 'Connecting...';
-                }}
-
-                function resetButton() {{
-                    var submitButton = document.getElementById('submit-button');
-                    submitButton.disabled = false;
-                    submitButton.value = 'Connect';
-                }}
-
-                // Call resetButton when the page loads
-                window.onload = resetButton;
-
-                // Add event listener for popstate to reset the button when navigating back
-                window.addEventListener('popstate', function(event) {{
-                    resetButton();
-                }});
-                
-                window.addEventListener('pageshow', function(event) {{
-                    resetButton();
-                }});
-            </script>
-        </head>
-        <body>
-            <h1>Configure WiFi</h1>
-            <form action="/configure" method="post" onsubmit="handleFormSubmit()">
-                <label for="ssid">Select SSID:</label>
-                <select id="ssid" name="ssid">
-                    {wifi_options}
-                </select>
-                <label for="password">Password:</label>
-                <input type="password" id="password" name="password" required>
-                <input type="submit" id="submit-button" value="Connect">
-            </form>
-        </body>
-        </html>
-        """
-        return html
-
-    def _generate_success_page(self):
-        """ Generate a simple success message page with a countdown timer """
-        html = """
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Connected</title>
-            <style>
-                body { font-family: Arial, sans-serif; text-align: center; padding: 50px; }
-                h1 { color: #4CAF50; }
-                p { font-size: 18px; }
-                .countdown { font-size: 24px; color: #FF5722; }
-            </style>
-        </head>
-        <body>
-            <h1>Connected!</h1>
-            <p>You are now connected to the WiFi network.  Closing window...</p>
-        </body>
-        </html>
-        """
-        return html
+    def _scan_networks(self):
+        """ Return deduplicated SSIDs from a scan, cached for 15 seconds.
+        Scanning blocks the event loop for seconds, and captive-portal
+        clients fire several requests back to back. """
+        now = utime.ticks_ms()
+        if self._scan_cache is None or utime.ticks_diff(now, self._scan_ts) > _SCAN_CACHE_TTL_MS:
+            ssids = set()
+            for ssid, *_ in self.wlan_sta.scan():
+                if ssid:  # Check if SSID is not empty
+                    ssids.add(ssid)
+            self._scan_cache = sorted(ssids)
+            self._scan_ts = now
+        return self._scan_cache
+
+    def _write_wifi_selection_page(self, writer):
+        """ Queue the HTML form with a list of nearby WiFi networks; the
+        caller drains the writer once after all pieces are buffered """
+        writer.write(_PAGE_HEAD)
+        for ssid in self._scan_networks():
+            writer.write(b'<option value="%s">%s</option>\n' % (ssid, ssid))
+        writer.write(_PAGE_TAIL)
 
     def _start_access_point(self):
         """ Setup the access point """
-        self.wlan_ap.active(True)
+        if not self.wlan_ap.active():
+            self.wlan_ap.active(True)
         self.wlan_ap.ifconfig((SERVER_IP, SERVER_SUBNET, SERVER_IP, SERVER_IP))
         self.wlan_ap.config(essid=self.ssid, authmode=network.AUTH_OPEN)
-        print('AP network config:', self.wlan_ap.ifconfig())
+        if DEBUG:
+            print('AP network config:', self.wlan_ap.ifconfig())
 
 
     async def run_dns_server(self):
@@ -334,72 +391,97 @@ class WifiManager:
         udps.setblocking(False)
         udps.bind(('0.0.0.0', 53))
 
+        # Reusable answer buffer (512 bytes is the classic DNS UDP limit),
+        # so building a reply allocates nothing on the heap. MicroPython's
+        # socket module has no recvfrom_into, so the rx side stays recvfrom.
+        tx = bytearray(512 + len(_DNS_ANSWER_TAIL))
+
+        # Only touch the socket when a packet is actually waiting, instead of
+        # recvfrom-ing into EAGAIN ten times a second while idle
+        poller = uselect.poll()
+        poller.register(udps, uselect.POLLIN)
+
         while True:
+            if not poller.poll(0):
+                await asyncio.sleep(0.05)
+                continue
             try:
-                data, addr = udps.recvfrom(4096)
+                data, addr = udps.recvfrom(512)
                 if data:  # Ensure data is not None
-                    dns_query = DNSQuery(data)
-                    udps.sendto(dns_query.response(SERVER_IP), addr)
+                    length = DNSQuery(data).response_into(tx)
+                    if length:
+                        udps.sendto(memoryview(tx)[:length], addr)
             except OSError as e:
-                if e.errno == 11:  # EAGAIN, no data available
-                    await asyncio.sleep(0.1)  # Wait before retrying
-                else:
+                if DEBUG:
                     print(f'DNS server error: {e}')
             except Exception as e:
-                print(f'Unexpected error in DNS server: {e}')
+                if DEBUG:
+                    print(f'Unexpected error in DNS server: {e}')
 
         udps.close()
         
 class DNSQuery:
     def __init__(self, data):
         self.data = data
-        self.domain = ''
-        tipo = (data[2] >> 3) & 15  # Opcode bits
-        if tipo == 0:  # Standard query
-            ini = 12
-            lon = data[ini]
-            while lon != 0:
-                self.domain += data[ini + 1:ini + lon + 1].decode('utf-8') + '.'
-                ini += lon + 1
-                lon = data[ini]
-
-    def response(self, ip):
-        if self.domain:
-            packet = self.data[:2] + b'\x81\x80'
-            packet += self.data[4:6] + self.data[4:6] + b'\x00\x00\x00\x00'  # Questions and Answers Counts
-            packet += self.data[12:]  # Original Domain Name Question
-            packet += b'\xC0\x0C'  # Pointer to domain name
-            packet += b'\x00\x01\x00\x01\x00\x00\x00\x3C\x00\x04'  # Response type, ttl and resource data length -> 4 bytes
-            packet += bytes(map(int, ip.split('.')))  # 4 bytes of IP address
-        return packet
+        # Standard query (opcode 0) with a non-empty question name. The
+        # name itself is never needed, so don't walk or decode the labels.
+        self.has_query = (len(data) > _DNS_HDR_LEN
+                          and (data[2] >> 3) & _DNS_OPCODE_MASK == 0
+                          and data[_DNS_HDR_LEN] != 0)
+
+    def response_into(self, buf):
+        """ Write the answer for this query into buf, return its length (0 if
+        the packet holds no query or the answer would not fit) """
+        if not self.has_query:
+            return 0
+        data = self.data
+        qlen = len(data) - _DNS_HDR_LEN
+        total = _DNS_HDR_LEN + qlen + len(_DNS_ANSWER_TAIL)
+        if total > len(buf):
+            return 0
+        buf[:2] = data[:2]  # Transaction ID
+        buf[2:4] = b'\x81\x80'  # Flags: standard response, no error
+        buf[4:6] = data[4:6]  # Questions Count
+        buf[6:8] = data[4:6]  # Answers Count
+        buf[8:_DNS_HDR_LEN] = b'\x00\x00\x00\x00'  # Authority and Additional Counts
+        buf[_DNS_HDR_LEN:_DNS_HDR_LEN + qlen] = data[_DNS_HDR_LEN:]  # Original Domain Name Question
+        buf[_DNS_HDR_LEN + qlen:total] = _DNS_ANSWER_TAIL
+        return total
     
 class SyncWifiManager:
     """ Synchronous wrapper for the WifiManager class """
 
     def __init__(self, ssid=DEFAULT_SSID, password=DEFAULT_SSID_PASSWORD):
         self.wifi_manager = WifiManager(ssid, password)
+        # One shared event loop for all calls, so background tasks started
+        # by one method (e.g. the DNS server) survive into the next.
+        # new_event_loop() already resets uasyncio's singleton loop state.
+        self._loop = asyncio.new_event_loop()
 
     def connect(self):
         """ Synchronously connect to WiFi, returns True if successful, False otherwise """
-        loop = asyncio.new_event_loop()  # Create a new event loop
-
-        try:
-            # Run the async connect method and return the result
-            return loop.run_until_complete(self.wifi_manager.connect())
-        finally:
-            loop.close()  # Close the event loop
+        return self._loop.run_until_complete(self.wifi_manager.connect())
 
     def start_captive_portal(self):
         """ Synchronously start the captive portal """
-        loop = asyncio.new_event_loop()  # Create a new event loop
+        return self._loop.run_until_complete(self.wifi_manager.start_captive_portal())
 
-        try:
-            loop.run_until_complete(self.wifi_manager.start_captive_portal())
-        finally:
-            loop.close()  # Close the event loop
+    def close(self):
+        """ Close the shared event loop """
+        self._loop.close()
             
-def url_decode(input_str):
-    """Decode URL-encoded string (replace '+' with ' ' and decode hex codes)"""
-    input_str = input_str.replace('+', ' ')
-    hex_codes = ure.compile(r'%([0-9A-Fa-f]{2})')
-    return hex_codes.sub(lambda match: chr(int(match.group(1), 16)), input_str)
+def _urldecode(data):
+    """ Decode URL-encoded bytes (replace '+' with ' ' and decode %XX codes) """
+    data = data.replace(b'+', b' ')
+    if b'%' not in data:
+        return data
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        if data[i] == 0x25 and i + 2 < len(data):  # '%'
+            out.append(int(data[i + 1:i + 3], 16))
+            i += 3
+        else:
+            out.append(data[i])
+            i += 1
+    return bytes(out)